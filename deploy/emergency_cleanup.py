@@ -8,10 +8,13 @@ import os
 import sys
 import json
 import boto3
+from botocore.config import Config
+from botocore.exceptions import WaiterError
 import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterator, Callable, Any, NamedTuple
 
 # Setup logging
 logging.basicConfig(
@@ -24,88 +27,182 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Largest page size accepted by the EC2 describe APIs (volumes cap it at 500 server-side)
+PAGE_SIZE = 1000
+
+# Instance states that still hold resources; terminated instances are left out
+ACTIVE_STATES = ['pending', 'running', 'stopping', 'stopped']
+ACTIVE_STATE_FILTER = {'Name': 'instance-state-name', 'Values': ACTIVE_STATES}
+
+# Discovery calls are independent read-only requests; keep the fan-out small to stay clear of EC2 throttling
+DISCOVERY_WORKERS = 6
+
+# Per-item delete/detach calls fanned out in parallel
+DELETE_WORKERS = 8
+
+# Wildcard markers of XTTS security groups; EC2 filters are case-sensitive, so common casings are listed
+SG_NAME_WILDCARDS = ['*xtts*', '*XTTS*', '*Xtts*', '*tts-api*', '*TTS-API*']
+SG_DESCRIPTION_WILDCARDS = ['*xtts*', '*XTTS*', '*Xtts*', '*tts api*', '*TTS API*', '*TTS Api*']
+
+# Resource types returned by the Resource Groups Tagging API discovery
+TAGGED_RESOURCE_TYPES = [
+    'ec2:instance', 'ec2:volume', 'ec2:security-group',
+    'ec2:spot-instances-request', 'ecr:repository'
+]
+
+# Tagging API pages are capped at 100 resources; EC2 filters accept at most 200 values
+TAGGING_PAGE_SIZE = 100
+FILTER_VALUES_LIMIT = 200
+
+# ECR batch_delete_image accepts at most 100 image ids per call
+ECR_DELETE_BATCH_SIZE = 100
+
+# Keyed describe lookups: kind -> (operation, result key, id filter name)
+DESCRIBE_BY_ID = {
+    'instances': ('describe_instances', 'Reservations', 'instance-id'),
+    'spot_requests': ('describe_spot_instance_requests', 'SpotInstanceRequests', 'spot-instance-request-id'),
+    'volumes': ('describe_volumes', 'Volumes', 'volume-id'),
+    'security_groups': ('describe_security_groups', 'SecurityGroups', 'group-id')
+}
+
+def chunked(items: List, size: int) -> Iterator[List]:
+    """Split a list into consecutive chunks of at most size items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+class InstanceRec(NamedTuple):
+    """EC2 instance found by discovery"""
+    id: str
+    state: str
+    launch_time: datetime
+    tags: List[Dict]
+    instance_type: str
+
+class VolumeRec(NamedTuple):
+    """EBS volume found by discovery"""
+    id: str
+    state: str
+    size: int
+    volume_type: str
+    tags: List[Dict]
+    attachments: List[Dict]
+
+class SGRec(NamedTuple):
+    """Security group found by discovery"""
+    id: str
+    name: str
+    description: str
+    tags: List[Dict]
+
+class SpotReqRec(NamedTuple):
+    """Spot instance request found by discovery"""
+    id: str
+    state: str
+    instance_id: Optional[str]
+    tags: List[Dict]
+
+def _instance_record(instance: Dict) -> InstanceRec:
+    return InstanceRec(
+        id=instance['InstanceId'],
+        state=instance['State']['Name'],
+        launch_time=instance['LaunchTime'],
+        tags=instance.get('Tags', []),
+        instance_type=instance['InstanceType']
+    )
+
+def _volume_record(volume: Dict) -> VolumeRec:
+    return VolumeRec(
+        id=volume['VolumeId'],
+        state=volume['State'],
+        size=volume['Size'],
+        volume_type=volume['VolumeType'],
+        tags=volume.get('Tags', []),
+        attachments=volume.get('Attachments', [])
+    )
+
+def _security_group_record(sg: Dict) -> SGRec:
+    return SGRec(
+        id=sg['GroupId'],
+        name=sg['GroupName'],
+        description=sg['Description'],
+        tags=sg.get('Tags', [])
+    )
+
+def _spot_request_record(request: Dict) -> SpotReqRec:
+    return SpotReqRec(
+        id=request['SpotInstanceRequestId'],
+        state=request['State'],
+        instance_id=request.get('InstanceId'),
+        tags=request.get('Tags', [])
+    )
+
+def _image_record(repository_name: str, image: Dict) -> Dict:
+    return {
+        'repositoryName': repository_name,
+        'imageDigest': image['imageDigest'],
+        'imageTags': image.get('imageTags', []),
+        'imageSizeInBytes': image.get('imageSizeInBytes', 0),
+        'imagePushedAt': image.get('imagePushedAt')
+    }
+
 class XTTSEmergencyCleanup:
     """Emergency cleanup for XTTS API Server AWS resources"""
 
     def __init__(self, region: str = "us-west-2"):
         self.region = region
-        self.ec2_client = boto3.client('ec2', region_name=region)
-        self.ecr_client = boto3.client('ecr', region_name=region)
+        # One session shared by all clients; the pool must cover the parallel discovery/delete
+        # workers, and adaptive retries back off on EC2 request throttling
+        config = Config(
+            region_name=region,
+            retries={'max_attempts': 10, 'mode': 'adaptive'},
+            max_pool_connections=32
+        )
+        self.session = boto3.session.Session()
+        self.ec2_client = self.session.client('ec2', config=config)
+        self.ecr_client = self.session.client('ecr', config=config)
+        self.tagging_client = self.session.client('resourcegroupstaggingapi', config=config)
 
         # XTTS-specific identifiers
         self.project_tags = ['xtts-api', 'XTTS-API-Server']
+        self.project_tag_set = set(self.project_tags)
         self.resource_prefixes = ['xtts-api', 'XTTS-API']
         self.instance_names = ['XTTS-API-Server']
         self.elastic_ip_allocation_id = "eipalloc-053fa187bd3ca7c89"
 
         logger.info(f"🧹 XTTS Emergency cleanup initialized for region: {region}")
 
-    def find_project_instances(self) -> List[Dict]:
+    def _paginate(self, client, operation: str, result_key: str,
+                  page_size: int = PAGE_SIZE, **kwargs) -> Iterator[Dict]:
+        """Yield every item under result_key across all pages of a describe call"""
+        paginator = client.get_paginator(operation)
+        pages = paginator.paginate(PaginationConfig={'PageSize': page_size}, **kwargs)
+        for page in pages:
+            yield from page.get(result_key, [])
+
+    def find_project_instances(self) -> List[InstanceRec]:
         """Find EC2 instances related to XTTS API Server"""
         logger.info("🔍 Searching for XTTS API Server instances...")
 
         instances = []
+        seen_ids = set()
         try:
-            # Search by project tags
-            for tag_value in self.project_tags:
-                response = self.ec2_client.describe_instances(
-                    Filters=[
-                        {'Name': 'tag:Project', 'Values': [tag_value]},
-                        {'Name': 'instance-state-name', 'Values': ['running', 'pending', 'stopping', 'stopped']}
-                    ]
-                )
-
-                for reservation in response['Reservations']:
+            # EC2 ORs multiple Values within a filter, so one call per tag key covers
+            # every project tag / instance name (the Name filter also matches all environments)
+            searches = [
+                {'Name': 'tag:Project', 'Values': self.project_tags},
+                {'Name': 'tag:Name', 'Values': self.instance_names},
+            ]
+            for tag_filter in searches:
+                for reservation in self._paginate(
+                    self.ec2_client, 'describe_instances', 'Reservations',
+                    Filters=[tag_filter, ACTIVE_STATE_FILTER]
+                ):
                     for instance in reservation['Instances']:
-                        if not any(i['InstanceId'] == instance['InstanceId'] for i in instances):
-                            instances.append({
-                                'InstanceId': instance['InstanceId'],
-                                'State': instance['State']['Name'],
-                                'LaunchTime': instance['LaunchTime'],
-                                'Tags': instance.get('Tags', []),
-                                'InstanceType': instance['InstanceType']
-                            })
-
-            # Search by instance name
-            for name in self.instance_names:
-                response = self.ec2_client.describe_instances(
-                    Filters=[
-                        {'Name': 'tag:Name', 'Values': [name]},
-                        {'Name': 'instance-state-name', 'Values': ['running', 'pending', 'stopping', 'stopped']}
-                    ]
-                )
-
-                for reservation in response['Reservations']:
-                    for instance in reservation['Instances']:
-                        if not any(i['InstanceId'] == instance['InstanceId'] for i in instances):
-                            instances.append({
-                                'InstanceId': instance['InstanceId'],
-                                'State': instance['State']['Name'],
-                                'LaunchTime': instance['LaunchTime'],
-                                'Tags': instance.get('Tags', []),
-                                'InstanceType': instance['InstanceType']
-                            })
-
-            # Search by environment tags (main, development)
-            for env in ['main', 'development', 'production']:
-                response = self.ec2_client.describe_instances(
-                    Filters=[
-                        {'Name': 'tag:Environment', 'Values': [env]},
-                        {'Name': 'tag:Name', 'Values': ['XTTS-API-Server']},
-                        {'Name': 'instance-state-name', 'Values': ['running', 'pending', 'stopping', 'stopped']}
-                    ]
-                )
-
-                for reservation in response['Reservations']:
-                    for instance in reservation['Instances']:
-                        if not any(i['InstanceId'] == instance['InstanceId'] for i in instances):
-                            instances.append({
-                                'InstanceId': instance['InstanceId'],
-                                'State': instance['State']['Name'],
-                                'LaunchTime': instance['LaunchTime'],
-                                'Tags': instance.get('Tags', []),
-                                'InstanceType': instance['InstanceType']
-                            })
+                        instance_id = instance['InstanceId']
+                        if instance_id in seen_ids:
+                            continue
+                        seen_ids.add(instance_id)
+                        instances.append(_instance_record(instance))
 
             logger.info(f"📊 Found {len(instances)} XTTS instances")
             return instances
@@ -114,44 +211,28 @@ class XTTSEmergencyCleanup:
             logger.error(f"❌ Error finding instances: {e}")
             return []
 
-    def find_project_security_groups(self) -> List[Dict]:
+    def find_project_security_groups(self) -> List[SGRec]:
         """Find security groups related to XTTS API Server"""
         logger.info("🔍 Searching for XTTS security groups...")
 
         security_groups = []
+        seen_ids = set()
         try:
-            response = self.ec2_client.describe_security_groups()
-
-            for sg in response['SecurityGroups']:
-                is_project_sg = False
-
-                # Check by tags
-                for tag in sg.get('Tags', []):
-                    if tag['Key'] == 'Project' and tag['Value'] in self.project_tags:
-                        is_project_sg = True
-                        break
-
-                # Check by name pattern
-                for prefix in self.resource_prefixes:
-                    if sg['GroupName'].startswith(prefix):
-                        is_project_sg = True
-                        break
-
-                # Check specific XTTS patterns
-                if any(pattern in sg['GroupName'].lower() for pattern in ['xtts', 'tts-api']):
-                    is_project_sg = True
-
-                # Check description
-                if 'xtts' in sg['Description'].lower() or 'tts api' in sg['Description'].lower():
-                    is_project_sg = True
-
-                if is_project_sg and sg['GroupName'] != 'default':
-                    security_groups.append({
-                        'GroupId': sg['GroupId'],
-                        'GroupName': sg['GroupName'],
-                        'Description': sg['Description'],
-                        'Tags': sg.get('Tags', [])
-                    })
+            # Let EC2 do the matching: by Project tag, by name prefix/pattern and by description
+            searches = [
+                {'Name': 'tag:Project', 'Values': self.project_tags},
+                {'Name': 'group-name', 'Values': [f'{prefix}*' for prefix in self.resource_prefixes] + SG_NAME_WILDCARDS},
+                {'Name': 'description', 'Values': SG_DESCRIPTION_WILDCARDS},
+            ]
+            for sg_filter in searches:
+                for sg in self._paginate(
+                    self.ec2_client, 'describe_security_groups', 'SecurityGroups',
+                    Filters=[sg_filter]
+                ):
+                    if sg['GroupId'] in seen_ids or sg['GroupName'] == 'default':
+                        continue
+                    seen_ids.add(sg['GroupId'])
+                    security_groups.append(_security_group_record(sg))
 
             logger.info(f"📊 Found {len(security_groups)} XTTS security groups")
             return security_groups
@@ -160,25 +241,24 @@ class XTTSEmergencyCleanup:
             logger.error(f"❌ Error finding security groups: {e}")
             return []
 
-    def find_spot_requests(self) -> List[Dict]:
+    def find_spot_requests(self) -> List[SpotReqRec]:
         """Find active spot instance requests for XTTS"""
         logger.info("🔍 Searching for XTTS spot instance requests...")
 
         spot_requests = []
         try:
-            response = self.ec2_client.describe_spot_instance_requests(
+            for request in self._paginate(
+                self.ec2_client, 'describe_spot_instance_requests', 'SpotInstanceRequests',
                 Filters=[
                     {'Name': 'state', 'Values': ['open', 'active']}
                 ]
-            )
-
-            for request in response['SpotInstanceRequests']:
+            ):
                 is_project_request = False
 
                 # Check tags
                 if 'Tags' in request:
                     for tag in request['Tags']:
-                        if (tag['Key'] == 'Project' and tag['Value'] in self.project_tags) or \
+                        if (tag['Key'] == 'Project' and tag['Value'] in self.project_tag_set) or \
                            (tag['Key'] == 'Name' and tag['Value'] in self.instance_names):
                             is_project_request = True
                             break
@@ -192,12 +272,7 @@ class XTTSEmergencyCleanup:
                             break
 
                 if is_project_request:
-                    spot_requests.append({
-                        'SpotInstanceRequestId': request['SpotInstanceRequestId'],
-                        'State': request['State'],
-                        'InstanceId': request.get('InstanceId'),
-                        'Tags': request.get('Tags', [])
-                    })
+                    spot_requests.append(_spot_request_record(request))
 
             logger.info(f"📊 Found {len(spot_requests)} XTTS spot requests")
             return spot_requests
@@ -206,51 +281,31 @@ class XTTSEmergencyCleanup:
             logger.error(f"❌ Error finding spot requests: {e}")
             return []
 
-    def find_project_volumes(self) -> List[Dict]:
+    def find_project_volumes(self) -> List[VolumeRec]:
         """Find EBS volumes related to XTTS API Server"""
         logger.info("🔍 Searching for XTTS EBS volumes...")
 
         volumes = []
+        seen_ids = set()
         try:
-            # Search by project tags
-            for tag_value in self.project_tags:
-                response = self.ec2_client.describe_volumes(
-                    Filters=[
-                        {'Name': 'tag:Project', 'Values': [tag_value]},
-                        {'Name': 'status', 'Values': ['available', 'in-use']}
-                    ]
-                )
-
-                for volume in response['Volumes']:
-                    if not any(v['VolumeId'] == volume['VolumeId'] for v in volumes):
-                        volumes.append({
-                            'VolumeId': volume['VolumeId'],
-                            'State': volume['State'],
-                            'Size': volume['Size'],
-                            'VolumeType': volume['VolumeType'],
-                            'Tags': volume.get('Tags', []),
-                            'Attachments': volume.get('Attachments', [])
-                        })
-
-            # Search by name patterns
-            for name in self.instance_names:
-                response = self.ec2_client.describe_volumes(
+            # One call for all project tags, one for all name patterns
+            searches = [
+                {'Name': 'tag:Project', 'Values': self.project_tags},
+                {'Name': 'tag:Name', 'Values': [f'{name}*' for name in self.instance_names]},
+            ]
+            for tag_filter in searches:
+                for volume in self._paginate(
+                    self.ec2_client, 'describe_volumes', 'Volumes',
                     Filters=[
-                        {'Name': 'tag:Name', 'Values': [f'{name}*']},
+                        tag_filter,
                         {'Name': 'status', 'Values': ['available', 'in-use']}
                     ]
-                )
-
-                for volume in response['Volumes']:
-                    if not any(v['VolumeId'] == volume['VolumeId'] for v in volumes):
-                        volumes.append({
-                            'VolumeId': volume['VolumeId'],
-                            'State': volume['State'],
-                            'Size': volume['Size'],
-                            'VolumeType': volume['VolumeType'],
-                            'Tags': volume.get('Tags', []),
-                            'Attachments': volume.get('Attachments', [])
-                        })
+                ):
+                    volume_id = volume['VolumeId']
+                    if volume_id in seen_ids:
+                        continue
+                    seen_ids.add(volume_id)
+                    volumes.append(_volume_record(volume))
 
             logger.info(f"📊 Found {len(volumes)} XTTS volumes")
             return volumes
@@ -290,26 +345,9 @@ class XTTSEmergencyCleanup:
         images = []
         try:
             # Check if ECR repositories exist
-            response = self.ecr_client.describe_repositories()
-
-            for repo in response['repositories']:
+            for repo in self._list_repositories():
                 if 'xtts' in repo['repositoryName'].lower():
-                    # Get images in this repository
-                    try:
-                        images_response = self.ecr_client.describe_images(
-                            repositoryName=repo['repositoryName']
-                        )
-
-                        for image in images_response['imageDetails']:
-                            images.append({
-                                'repositoryName': repo['repositoryName'],
-                                'imageDigest': image['imageDigest'],
-                                'imageTags': image.get('imageTags', []),
-                                'imageSizeInBytes': image.get('imageSizeInBytes', 0),
-                                'imagePushedAt': image.get('imagePushedAt')
-                            })
-                    except Exception as e:
-                        logger.warning(f"Could not list images in {repo['repositoryName']}: {e}")
+                    images.extend(self._find_repository_images(repo['repositoryName']))
 
             logger.info(f"📊 Found {len(images)} XTTS Docker images")
             return images
@@ -321,7 +359,111 @@ class XTTSEmergencyCleanup:
                 logger.error(f"❌ Error finding Docker images: {e}")
             return []
 
-    def terminate_instances(self, instances: List[Dict], force: bool = False) -> bool:
+    def _list_repositories(self) -> List[Dict]:
+        """List all ECR repositories in the region"""
+        return list(self._paginate(self.ecr_client, 'describe_repositories', 'repositories'))
+
+    def _find_repository_images(self, repository_name: str) -> List[Dict]:
+        """List the images of one ECR repository, logging instead of raising on failure"""
+        try:
+            return [
+                _image_record(repository_name, image)
+                for image in self._paginate(
+                    self.ecr_client, 'describe_images', 'imageDetails',
+                    repositoryName=repository_name
+                )
+            ]
+        except Exception as e:
+            logger.warning(f"Could not list images in {repository_name}: {e}")
+            return []
+
+    def _describe_by_ids(self, kind: str, ids: List[str],
+                         extra_filters: Optional[List[Dict]] = None) -> List[Dict]:
+        """Describe known resources by id instead of re-scanning by tag.
+
+        Ids are passed as a server-side filter, so resources that no longer exist
+        are simply absent from the result instead of failing the whole call.
+        """
+        operation, result_key, id_filter = DESCRIBE_BY_ID[kind]
+        items = []
+        for chunk in chunked(ids, FILTER_VALUES_LIMIT):
+            items.extend(self._paginate(
+                self.ec2_client, operation, result_key,
+                Filters=[{'Name': id_filter, 'Values': chunk}] + (extra_filters or [])
+            ))
+
+        if kind == 'instances':
+            return [instance for reservation in items for instance in reservation['Instances']]
+        return items
+
+    def find_all_project_resources(self) -> Dict:
+        """Discover Project-tagged resources with one Resource Groups Tagging API query.
+
+        Returns the same categories as discover_resources(). Only tagged resources are
+        found, so untagged resources matched by name patterns are not included.
+        """
+        logger.info("🔍 Searching for Project-tagged XTTS resources via the tagging API...")
+
+        found = {
+            'instances': [],
+            'spot_requests': [],
+            'volumes': [],
+            'security_groups': [],
+            'elastic_ip': None,
+            'docker_images': []
+        }
+        try:
+            # Bucket ARNs (arn:aws:<service>:<region>:<account>:<type>/<id>) by resource type
+            ids_by_type = {}
+            for mapping in self._paginate(
+                self.tagging_client, 'get_resources', 'ResourceTagMappingList',
+                page_size=TAGGING_PAGE_SIZE,
+                TagFilters=[{'Key': 'Project', 'Values': self.project_tags}],
+                ResourceTypeFilters=TAGGED_RESOURCE_TYPES
+            ):
+                resource = mapping['ResourceARN'].split(':', 5)[5]
+                resource_type, _, resource_id = resource.partition('/')
+                ids_by_type.setdefault(resource_type, []).append(resource_id)
+
+            # Hydrate only the buckets that have ids
+            if ids_by_type.get('instance'):
+                found['instances'] = [_instance_record(i) for i in self._describe_by_ids(
+                    'instances', ids_by_type['instance'], [ACTIVE_STATE_FILTER]
+                )]
+
+            if ids_by_type.get('spot-instances-request'):
+                found['spot_requests'] = [_spot_request_record(r) for r in self._describe_by_ids(
+                    'spot_requests', ids_by_type['spot-instances-request'],
+                    [{'Name': 'state', 'Values': ['open', 'active']}]
+                )]
+
+            if ids_by_type.get('volume'):
+                found['volumes'] = [_volume_record(v) for v in self._describe_by_ids(
+                    'volumes', ids_by_type['volume'],
+                    [{'Name': 'status', 'Values': ['available', 'in-use']}]
+                )]
+
+            if ids_by_type.get('security-group'):
+                found['security_groups'] = [_security_group_record(sg) for sg in self._describe_by_ids(
+                    'security_groups', ids_by_type['security-group']
+                ) if sg['GroupName'] != 'default']
+
+            for repository_name in ids_by_type.get('repository', []):
+                found['docker_images'].extend(self._find_repository_images(repository_name))
+
+            # The elastic IP is tracked by allocation id rather than by tag
+            found['elastic_ip'] = self.check_elastic_ip_association()
+
+            logger.info(f"📊 Found {len(found['instances'])} instances, {len(found['spot_requests'])} spot requests, "
+                        f"{len(found['volumes'])} volumes, {len(found['security_groups'])} security groups, "
+                        f"{len(found['docker_images'])} Docker images via the tagging API")
+            return found
+
+        except Exception as e:
+            logger.error(f"❌ Error querying the tagging API: {e}")
+            return found
+
+    def terminate_instances(self, instances: List[InstanceRec], force: bool = False) -> bool:
         """Terminate XTTS EC2 instances"""
         if not instances:
             logger.info("✅ No XTTS instances to terminate")
@@ -330,17 +472,17 @@ class XTTSEmergencyCleanup:
         logger.info(f"🔄 Terminating {len(instances)} XTTS instances...")
 
         try:
-            instance_ids = [i['InstanceId'] for i in instances]
+            instance_ids = [i.id for i in instances]
 
             if not force:
                 print("\n" + "="*70)
                 print("XTTS INSTANCES TO TERMINATE:")
                 print("="*70)
                 for instance in instances:
-                    tags = {tag['Key']: tag['Value'] for tag in instance['Tags']}
+                    tags = {tag['Key']: tag['Value'] for tag in instance.tags}
                     name = tags.get('Name', 'Unknown')
                     env = tags.get('Environment', 'Unknown')
-                    print(f"  {instance['InstanceId']} - {name} [{env}] ({instance['State']}, {instance['InstanceType']})")
+                    print(f"  {instance.id} - {name} [{env}] ({instance.state}, {instance.instance_type})")
 
                 confirm = input("\nAre you sure you want to terminate these XTTS instances? (yes/no): ")
                 if confirm.lower() != 'yes':
@@ -349,14 +491,27 @@ class XTTSEmergencyCleanup:
 
             # Terminate instances
             self.ec2_client.terminate_instances(InstanceIds=instance_ids)
-            logger.info(f"✅ Terminated {len(instance_ids)} XTTS instances")
-            return True
 
         except Exception as e:
             logger.error(f"❌ Error terminating instances: {e}")
             return False
 
-    def cancel_spot_requests(self, spot_requests: List[Dict]) -> bool:
+        # Confirm the new state with a keyed lookup of just these instances;
+        # termination already went through, so a failed check is only a warning
+        try:
+            not_terminating = [
+                i['InstanceId'] for i in self._describe_by_ids('instances', instance_ids)
+                if i['State']['Name'] not in ('shutting-down', 'terminated')
+            ]
+            if not_terminating:
+                logger.warning(f"⚠️  Instances not terminating yet: {', '.join(not_terminating)}")
+        except Exception as e:
+            logger.warning(f"⚠️  Could not confirm instance termination state: {e}")
+
+        logger.info(f"✅ Terminated {len(instance_ids)} XTTS instances")
+        return True
+
+    def cancel_spot_requests(self, spot_requests: List[SpotReqRec]) -> bool:
         """Cancel XTTS spot instance requests"""
         if not spot_requests:
             logger.info("✅ No XTTS spot requests to cancel")
@@ -365,7 +520,7 @@ class XTTSEmergencyCleanup:
         logger.info(f"🔄 Cancelling {len(spot_requests)} XTTS spot requests...")
 
         try:
-            request_ids = [r['SpotInstanceRequestId'] for r in spot_requests]
+            request_ids = [r.id for r in spot_requests]
             self.ec2_client.cancel_spot_instance_requests(SpotInstanceRequestIds=request_ids)
             logger.info(f"✅ Cancelled {len(request_ids)} XTTS spot requests")
             return True
@@ -394,7 +549,7 @@ class XTTSEmergencyCleanup:
             logger.error(f"❌ Error disassociating elastic IP: {e}")
             return False
 
-    def delete_security_groups(self, security_groups: List[Dict], force: bool = False) -> bool:
+    def delete_security_groups(self, security_groups: List[SGRec], force: bool = False) -> bool:
         """Delete XTTS security groups"""
         if not security_groups:
             logger.info("✅ No XTTS security groups to delete")
@@ -408,7 +563,7 @@ class XTTSEmergencyCleanup:
                 print("XTTS SECURITY GROUPS TO DELETE:")
                 print("="*70)
                 for sg in security_groups:
-                    print(f"  {sg['GroupId']} - {sg['GroupName']} ({sg['Description']})")
+                    print(f"  {sg.id} - {sg.name} ({sg.description})")
 
                 confirm = input("\nAre you sure you want to delete these XTTS security groups? (yes/no): ")
                 if confirm.lower() != 'yes':
@@ -416,12 +571,8 @@ class XTTSEmergencyCleanup:
                     return False
 
             # Delete security groups
-            for sg in security_groups:
-                try:
-                    self.ec2_client.delete_security_group(GroupId=sg['GroupId'])
-                    logger.info(f"✅ Deleted security group: {sg['GroupName']}")
-                except Exception as e:
-                    logger.error(f"⚠️  Failed to delete {sg['GroupName']}: {e}")
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                list(executor.map(self._delete_security_group, security_groups))
 
             return True
 
@@ -429,7 +580,7 @@ class XTTSEmergencyCleanup:
             logger.error(f"❌ Error deleting security groups: {e}")
             return False
 
-    def delete_volumes(self, volumes: List[Dict], force: bool = False) -> bool:
+    def delete_volumes(self, volumes: List[VolumeRec], force: bool = False) -> bool:
         """Delete XTTS EBS volumes"""
         if not volumes:
             logger.info("✅ No XTTS volumes to delete")
@@ -442,14 +593,14 @@ class XTTSEmergencyCleanup:
                 print("\n" + "="*70)
                 print("XTTS EBS VOLUMES TO DELETE:")
                 print("="*70)
-                total_size = sum(v['Size'] for v in volumes)
+                total_size = sum(v.size for v in volumes)
                 for volume in volumes:
-                    tags = {tag['Key']: tag['Value'] for tag in volume['Tags']}
+                    tags = {tag['Key']: tag['Value'] for tag in volume.tags}
                     name = tags.get('Name', 'Unknown')
                     attached_to = 'Unattached'
-                    if volume['Attachments']:
-                        attached_to = f"Attached to {volume['Attachments'][0]['InstanceId']}"
-                    print(f"  {volume['VolumeId']} - {name} ({volume['Size']}GB {volume['VolumeType']}, {volume['State']}, {attached_to})")
+                    if volume.attachments:
+                        attached_to = f"Attached to {volume.attachments[0]['InstanceId']}"
+                    print(f"  {volume.id} - {name} ({volume.size}GB {volume.volume_type}, {volume.state}, {attached_to})")
 
                 print(f"\nTotal storage: {total_size}GB")
                 confirm = input("\nAre you sure you want to delete these XTTS volumes? (yes/no): ")
@@ -457,32 +608,31 @@ class XTTSEmergencyCleanup:
                     logger.info("❌ Volume deletion cancelled by user")
                     return False
 
-            # Delete volumes
-            for volume in volumes:
-                try:
-                    volume_id = volume['VolumeId']
-
-                    # If volume is attached, detach it first
-                    if volume['Attachments']:
-                        logger.info(f"🔌 Detaching volume {volume_id}...")
-                        for attachment in volume['Attachments']:
-                            self.ec2_client.detach_volume(
-                                VolumeId=volume_id,
-                                InstanceId=attachment['InstanceId'],
-                                Force=True
-                            )
-
-                        # Wait for volume to be available
-                        logger.info(f"⏳ Waiting for volume {volume_id} to become available...")
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as executor:
+                # Detach attached volumes first, then wait for all of them in one waiter call
+                attached = [v for v in volumes if v.attachments]
+                detach_results = dict(zip(
+                    [v.id for v in attached],
+                    executor.map(self._detach_volume, attached)
+                ))
+                detached_ids = [volume_id for volume_id, ok in detach_results.items() if ok]
+
+                if detached_ids:
+                    logger.info(f"⏳ Waiting for {len(detached_ids)} volumes to become available...")
+                    try:
                         waiter = self.ec2_client.get_waiter('volume_available')
-                        waiter.wait(VolumeIds=[volume_id])
-
-                    # Delete the volume
-                    self.ec2_client.delete_volume(VolumeId=volume_id)
-                    logger.info(f"✅ Deleted volume: {volume_id}")
+                        waiter.wait(VolumeIds=detached_ids)
+                    except Exception as e:
+                        logger.error(f"⚠️  Not all detached volumes became available: {e}")
+                        # Re-check just the detached volumes and skip the ones still attached
+                        available = {v['VolumeId'] for v in self._describe_by_ids('volumes', detached_ids)
+                                     if v['State'] == 'available'}
+                        for volume_id in detached_ids:
+                            detach_results[volume_id] = volume_id in available
 
-                except Exception as e:
-                    logger.error(f"⚠️  Failed to delete volume {volume['VolumeId']}: {e}")
+                # Delete volumes, skipping those that could not be detached
+                volume_ids = [v.id for v in volumes if detach_results.get(v.id, True)]
+                list(executor.map(self._delete_volume, volume_ids))
 
             return True
 
@@ -490,6 +640,42 @@ class XTTSEmergencyCleanup:
             logger.error(f"❌ Error deleting volumes: {e}")
             return False
 
+    def _delete_security_group(self, sg: SGRec) -> bool:
+        """Delete a single security group, logging instead of raising on failure"""
+        try:
+            self.ec2_client.delete_security_group(GroupId=sg.id)
+            logger.info(f"✅ Deleted security group: {sg.name}")
+            return True
+        except Exception as e:
+            logger.error(f"⚠️  Failed to delete {sg.name}: {e}")
+            return False
+
+    def _detach_volume(self, volume: VolumeRec) -> bool:
+        """Force-detach a volume from all its instances, logging instead of raising on failure"""
+        volume_id = volume.id
+        try:
+            logger.info(f"🔌 Detaching volume {volume_id}...")
+            for attachment in volume.attachments:
+                self.ec2_client.detach_volume(
+                    VolumeId=volume_id,
+                    InstanceId=attachment['InstanceId'],
+                    Force=True
+                )
+            return True
+        except Exception as e:
+            logger.error(f"⚠️  Failed to detach volume {volume_id}: {e}")
+            return False
+
+    def _delete_volume(self, volume_id: str) -> bool:
+        """Delete a single volume, logging instead of raising on failure"""
+        try:
+            self.ec2_client.delete_volume(VolumeId=volume_id)
+            logger.info(f"✅ Deleted volume: {volume_id}")
+            return True
+        except Exception as e:
+            logger.error(f"⚠️  Failed to delete volume {volume_id}: {e}")
+            return False
+
     def cleanup_docker_images(self, images: List[Dict], force: bool = False) -> bool:
         """Clean up XTTS Docker images from ECR"""
         if not images:
@@ -529,11 +715,17 @@ class XTTSEmergencyCleanup:
             for repo_name, repo_images in repos.items():
                 try:
                     image_ids = [{'imageDigest': img['imageDigest']} for img in repo_images]
-                    self.ecr_client.batch_delete_image(
-                        repositoryName=repo_name,
-                        imageIds=image_ids
-                    )
-                    logger.info(f"✅ Deleted {len(image_ids)} images from {repo_name}")
+                    deleted = 0
+                    for batch in chunked(image_ids, ECR_DELETE_BATCH_SIZE):
+                        response = self.ecr_client.batch_delete_image(
+                            repositoryName=repo_name,
+                            imageIds=batch
+                        )
+                        deleted += len(response.get('imageIds', []))
+                        for failure in response.get('failures', []):
+                            logger.error(f"⚠️  Failed to delete image {failure.get('imageId')} from {repo_name}: "
+                                         f"{failure.get('failureReason')}")
+                    logger.info(f"✅ Deleted {deleted} images from {repo_name}")
                 except Exception as e:
                     logger.error(f"⚠️  Failed to delete images from {repo_name}: {e}")
 
@@ -543,8 +735,68 @@ class XTTSEmergencyCleanup:
             logger.error(f"❌ Error cleaning up Docker images: {e}")
             return False
 
-    def run_full_cleanup(self, force: bool = False) -> Dict[str, bool]:
-        """Run complete XTTS cleanup"""
+    def discover_resources(self, on_found: Optional[Callable[[str, Any], None]] = None) -> Dict:
+        """Run all discovery calls concurrently and return their results by category.
+
+        on_found is called with (category, result) as soon as each category completes,
+        while the remaining discovery calls are still in flight.
+        """
+        tasks = {
+            'instances': self.find_project_instances,
+            'spot_requests': self.find_spot_requests,
+            'volumes': self.find_project_volumes,
+            'security_groups': self.find_project_security_groups,
+            'elastic_ip': self.check_elastic_ip_association,
+            'docker_images': self.find_docker_images
+        }
+
+        found = {}
+        with ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS) as executor:
+            futures = {executor.submit(find): category for category, find in tasks.items()}
+            for future in as_completed(futures):
+                category = futures[future]
+                found[category] = future.result()
+                if on_found:
+                    on_found(category, found[category])
+
+        # Keep the category order stable for callers
+        return {category: found[category] for category in tasks}
+
+    def retry_remaining(self, volumes: List[VolumeRec], security_groups: List[SGRec]) -> Dict[str, bool]:
+        """Retry deletion of volumes and security groups that survived a cleanup pass.
+
+        Only the previously discovered ids are looked up again, so calling this
+        repeatedly is cheap and safe once everything is gone.
+        """
+        try:
+            remaining_volumes = [_volume_record(v) for v in self._describe_by_ids(
+                'volumes', [v.id for v in volumes],
+                [{'Name': 'status', 'Values': ['available', 'in-use']}]
+            )] if volumes else []
+            remaining_sgs = [_security_group_record(sg) for sg in self._describe_by_ids(
+                'security_groups', [sg.id for sg in security_groups]
+            )] if security_groups else []
+        except Exception as e:
+            logger.error(f"❌ Error re-checking remaining resources: {e}")
+            return {'volumes': False, 'security_groups': False}
+
+        if not remaining_volumes and not remaining_sgs:
+            return {'volumes': True, 'security_groups': True}
+
+        logger.info(f"🔁 Retrying {len(remaining_volumes)} volumes and {len(remaining_sgs)} security groups...")
+        return {
+            'volumes': self.delete_volumes(remaining_volumes, force=True),
+            'security_groups': self.delete_security_groups(remaining_sgs, force=True)
+        }
+
+    def run_full_cleanup(self, force: bool = False, tag_discovery: bool = False,
+                         auto_cancel_spot: bool = False) -> Dict[str, bool]:
+        """Run complete XTTS cleanup.
+
+        With force or auto_cancel_spot, spot requests are cancelled and the elastic IP
+        is disassociated as soon as they are found, overlapping that work with the
+        rest of discovery and the confirmation prompt.
+        """
         logger.info("🧹 Starting XTTS emergency cleanup...")
 
         results = {
@@ -556,59 +808,118 @@ class XTTSEmergencyCleanup:
             'docker_images': False
         }
 
+        # Results of cleanup steps started during discovery
+        early_results = {}
+
+        def start_early_cleanup(category: str, result: Any):
+            if category == 'spot_requests':
+                early_results[category] = self.cancel_spot_requests(result)
+            elif category == 'elastic_ip':
+                early_results[category] = self.disassociate_elastic_ip(result)
+
+        on_found = start_early_cleanup if force or auto_cancel_spot else None
+
         try:
             # Find all resources
-            instances = self.find_project_instances()
-            spot_requests = self.find_spot_requests()
-            volumes = self.find_project_volumes()
-            security_groups = self.find_project_security_groups()
-            elastic_ip_info = self.check_elastic_ip_association()
-            docker_images = self.find_docker_images()
+            if tag_discovery:
+                found = self.find_all_project_resources()
+                if on_found:
+                    for category, result in found.items():
+                        on_found(category, result)
+            else:
+                found = self.discover_resources(on_found)
+            results.update(early_results)
+
+            instances = found['instances']
+            spot_requests = found['spot_requests']
+            volumes = found['volumes']
+            security_groups = found['security_groups']
+            elastic_ip_info = found['elastic_ip']
+            docker_images = found['docker_images']
 
             # Show summary
+            eip_associated = bool(elastic_ip_info and elastic_ip_info['Associated'])
             total_resources = (len(instances) + len(spot_requests) + len(volumes) +
                              len(security_groups) + len(docker_images) +
-                             (1 if elastic_ip_info and elastic_ip_info['Associated'] else 0))
+                             (1 if eip_associated else 0))
 
             if total_resources == 0:
                 logger.info("🎉 No XTTS resources found to clean up!")
                 return results
 
+            # Spot requests and the elastic IP may already have been handled during discovery
+            early_done = []
+            spot_line = f"{len(spot_requests)}"
+            if 'spot_requests' in early_results and spot_requests:
+                status = 'already cancelled' if early_results['spot_requests'] else 'early cancel failed'
+                spot_line += f" ({status})"
+                early_done.append(f"{len(spot_requests)} spot requests {status}")
+            eip_line = 'Yes' if eip_associated else 'No'
+            if 'elastic_ip' in early_results and eip_associated:
+                status = 'already disassociated' if early_results['elastic_ip'] else 'early disassociate failed'
+                eip_line += f" ({status})"
+                early_done.append(f"elastic IP {status}")
+
+            pending_resources = (len(instances) + len(volumes) + len(security_groups) + len(docker_images) +
+                                 (0 if 'spot_requests' in early_results else len(spot_requests)) +
+                                 (1 if eip_associated and 'elastic_ip' not in early_results else 0))
+
             print(f"\n{'='*70}")
             print("XTTS CLEANUP SUMMARY")
             print(f"{'='*70}")
             print(f"EC2 Instances: {len(instances)}")
-            print(f"Spot Requests: {len(spot_requests)}")
+            print(f"Spot Requests: {spot_line}")
             print(f"EBS Volumes: {len(volumes)}")
             print(f"Security Groups: {len(security_groups)}")
             print(f"Docker Images: {len(docker_images)}")
-            print(f"Elastic IP Associated: {'Yes' if elastic_ip_info and elastic_ip_info['Associated'] else 'No'}")
+            print(f"Elastic IP Associated: {eip_line}")
             if elastic_ip_info:
                 print(f"Elastic IP Address: {elastic_ip_info['PublicIp']}")
             print(f"{'='*70}")
 
+            if pending_resources == 0:
+                logger.info("🎉 No remaining XTTS resources to clean up")
+                return results
+
             if not force:
-                confirm = input(f"\nProceed with cleanup of {total_resources} XTTS resources? (yes/no): ")
+                if early_done:
+                    logger.warning(f"⚠️  Already done before confirmation: {'; '.join(early_done)}")
+                confirm = input(f"\nProceed with cleanup of {pending_resources} remaining XTTS resources? (yes/no): ")
                 if confirm.lower() != 'yes':
                     logger.info("❌ XTTS cleanup cancelled by user")
+                    if early_done:
+                        logger.warning(f"⚠️  Not undone: {'; '.join(early_done)}")
                     return results
 
             # Perform cleanup in order
-            results['spot_requests'] = self.cancel_spot_requests(spot_requests)
-            results['elastic_ip'] = self.disassociate_elastic_ip(elastic_ip_info)
+            if 'spot_requests' not in early_results:
+                results['spot_requests'] = self.cancel_spot_requests(spot_requests)
+            if 'elastic_ip' not in early_results:
+                results['elastic_ip'] = self.disassociate_elastic_ip(elastic_ip_info)
             results['instances'] = self.terminate_instances(instances, force=True)
 
-            # Wait for instances to terminate
-            if instances:
+            # Wait for instances to terminate so their volumes can be detached
+            if instances and results['instances']:
                 logger.info("⏳ Waiting for instances to terminate...")
-                import time
-                time.sleep(30)
+                try:
+                    waiter = self.ec2_client.get_waiter('instance_terminated')
+                    waiter.wait(
+                        InstanceIds=[i.id for i in instances],
+                        WaiterConfig={'Delay': 5, 'MaxAttempts': 40}
+                    )
+                except WaiterError as e:
+                    logger.error(f"⚠️  Instances did not all reach terminated state: {e}")
 
             # Clean up remaining resources
             results['volumes'] = self.delete_volumes(volumes, force=True)
             results['security_groups'] = self.delete_security_groups(security_groups, force=True)
             results['docker_images'] = self.cleanup_docker_images(docker_images, force=True)
 
+            # Security groups often fail while terminated instances still hold their ENIs
+            retried = self.retry_remaining(volumes, security_groups)
+            results['volumes'] = results['volumes'] and retried['volumes']
+            results['security_groups'] = results['security_groups'] and retried['security_groups']
+
             # Summary
             successful_cleanups = sum(results.values())
             logger.info(f"🎯 XTTS cleanup completed: {successful_cleanups}/{len(results)} categories successful")
@@ -627,6 +938,11 @@ def main():
     parser.add_argument("--region", type=str, default="us-west-2", help="AWS region")
     parser.add_argument("--force", action="store_true", help="Skip confirmation prompts")
     parser.add_argument("--list-only", action="store_true", help="Only list resources, don't delete")
+    parser.add_argument("--tag-discovery", action="store_true",
+                        help="Discover resources with one tagging API query (Project-tagged resources only)")
+    parser.add_argument("--auto-cancel-spot", action="store_true",
+                        help="Cancel spot requests and disassociate the elastic IP as soon as they are found, "
+                             "before the confirmation prompt")
 
     args = parser.parse_args()
 
@@ -635,14 +951,16 @@ def main():
 
         if args.list_only:
             logger.info("📋 LISTING XTTS RESOURCES ONLY (no deletion)")
-            cleanup.find_project_instances()
-            cleanup.find_spot_requests()
-            cleanup.find_project_security_groups()
-            cleanup.find_project_volumes()
-            cleanup.check_elastic_ip_association()
-            cleanup.find_docker_images()
+            if args.tag_discovery:
+                cleanup.find_all_project_resources()
+            else:
+                cleanup.discover_resources()
         else:
-            results = cleanup.run_full_cleanup(force=args.force)
+            results = cleanup.run_full_cleanup(
+                force=args.force,
+                tag_discovery=args.tag_discovery,
+                auto_cancel_spot=args.auto_cancel_spot
+            )
 
             # Final summary
             print(f"\n{'='*70}")
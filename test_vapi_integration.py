@@ -2,22 +2,91 @@
 """
 Test script for Vapi.ai integration with XTTS API Server
 """
+import argparse
+import atexit
+import asyncio
+import aiohttp
+import hashlib
+import numpy as np
+import os
 import requests
 import json
+import shutil
 import time
-import wave
 import struct
+from collections import Counter
+from pathlib import Path
+from requests.adapters import HTTPAdapter
 
 # Configuration
 API_BASE = "http://35.80.239.175:8020"  # Your AWS server
 VAPI_ENDPOINT = f"{API_BASE}/vapi/tts"
 HEALTH_ENDPOINT = f"{API_BASE}/vapi/health"
 
+# (connect, read) timeouts - synthesis of long text can take a while
+REQUEST_TIMEOUT = (3.05, 60)
+
+# One keep-alive session for all requests instead of a new connection per call.
+# The server runs on uvicorn, which speaks HTTP/1.1 only, so pooled keep-alive
+# connections (not HTTP/2 multiplexing) are what saves the handshakes here.
+SESSION = requests.Session()
+SESSION.headers.update({"Content-Type": "application/json"})
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+atexit.register(SESSION.close)
+
+SWEEP_SAMPLE_RATES = [8000, 16000, 22050, 24000]
+
+# Benchmark concurrency levels used when --concurrency is not given
+DEFAULT_CONCURRENCY_LEVELS = [1]
+
+def real_time_factor(elapsed, num_bytes, sample_rate):
+    """Generation time divided by the duration of the returned 16-bit mono audio"""
+    audio_seconds = num_bytes / 2 / sample_rate
+    return elapsed / audio_seconds if audio_seconds else float('inf')
+
+# Fields shared by every Vapi.ai voice request
+_STATIC_REQUEST = {"type": "voice-request"}
+
+def voice_request(text, sample_rate, timestamp=None):
+    """Build a Vapi.ai format request body"""
+    if timestamp is None:
+        timestamp = time.time_ns() // 1_000_000_000
+    return {**_STATIC_REQUEST, "text": text, "sampleRate": sample_rate, "timestamp": timestamp}
+
+# Response bodies are streamed to disk in chunks of this size
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Local cache of generated PCM audio keyed by (endpoint, text, sample rate)
+CACHE_DIR = Path(".tts_cache")
+CACHE_TTL = 24 * 60 * 60
+
+def _cache_path(text, sample_rate):
+    key = hashlib.md5(f"{VAPI_ENDPOINT}|{text}|{sample_rate}".encode()).hexdigest()
+    return CACHE_DIR / f"{key}.pcm"
+
+def cached_audio(text, sample_rate):
+    """Return the path of fresh cached PCM audio for this request, or None"""
+    path = _cache_path(text, sample_rate)
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if time.time() - mtime > CACHE_TTL:
+        return None
+    return path
+
+def store_audio(text, sample_rate, pcm_filename):
+    """Copy freshly generated PCM audio into the cache"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    shutil.copyfile(pcm_filename, _cache_path(text, sample_rate))
+
 def test_health_check():
     """Test the health check endpoint"""
     print("🔍 Testing health check endpoint...")
     try:
-        response = requests.get(HEALTH_ENDPOINT)
+        response = SESSION.get(HEALTH_ENDPOINT, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
             data = response.json()
             print(f"✅ Health check passed:")
@@ -34,136 +103,317 @@ def test_health_check():
         print(f"❌ Health check error: {e}")
         return False
 
-def test_vapi_tts(text="Hello from Vapi.ai integration!", sample_rate=22050):
+def test_vapi_tts(text="Hello from Vapi.ai integration!", sample_rate=22050, use_cache=False):
     """Test the Vapi.ai TTS endpoint"""
     print(f"🎤 Testing Vapi.ai TTS endpoint...")
     print(f"   Text: {text}")
     print(f"   Sample Rate: {sample_rate}")
 
+    pcm_filename = f"test_output_{sample_rate}hz.pcm"
+    wav_filename = f"test_output_{sample_rate}hz.wav"
+
+    # Skip the round-trip entirely when this phrase was synthesized recently
+    cached = cached_audio(text, sample_rate) if use_cache else None
+    if cached:
+        shutil.copyfile(cached, pcm_filename)
+        print(f"⚠️  Using cached audio: {cached} (not contacting server)")
+        convert_pcm_to_wav(pcm_filename, wav_filename, sample_rate)
+        print(f"   Converted to WAV: {wav_filename}")
+        return True
+
     # Prepare Vapi.ai format request
-    request_data = {
-        "type": "voice-request",
-        "text": text,
-        "sampleRate": sample_rate,
-        "timestamp": int(time.time())
-    }
+    request_data = voice_request(text, sample_rate)
 
     try:
         start_time = time.time()
-        response = requests.post(
-            VAPI_ENDPOINT,
-            json=request_data,
-            headers={"Content-Type": "application/json"}
-        )
-        end_time = time.time()
+        with SESSION.post(VAPI_ENDPOINT, json=request_data, stream=True, timeout=REQUEST_TIMEOUT) as response:
+            if response.status_code != 200:
+                print(f"❌ TTS request failed: {response.status_code}")
+                try:
+                    error_data = response.json()
+                    print(f"   Error: {error_data.get('detail', 'Unknown error')}")
+                except:
+                    print(f"   Raw response: {response.text}")
+                return False
 
-        if response.status_code == 200:
             # Check response headers
             content_type = response.headers.get('content-type', '')
             content_length = response.headers.get('content-length', 0)
 
-            print(f"✅ TTS request successful:")
-            print(f"   Response time: {end_time - start_time:.2f}s")
-            print(f"   Content-Type: {content_type}")
-            print(f"   Content-Length: {content_length} bytes")
-            print(f"   Data size: {len(response.content)} bytes")
-
-            # Save PCM data for verification
-            if response.content:
-                pcm_filename = f"test_output_{sample_rate}hz.pcm"
-                with open(pcm_filename, 'wb') as f:
-                    f.write(response.content)
-                print(f"   Saved PCM data to: {pcm_filename}")
-
-                # Convert PCM to WAV for testing
-                wav_filename = f"test_output_{sample_rate}hz.wav"
-                convert_pcm_to_wav(response.content, wav_filename, sample_rate)
-                print(f"   Converted to WAV: {wav_filename}")
-
-                return True
-            else:
-                print("❌ No audio data received")
-                return False
-        else:
-            print(f"❌ TTS request failed: {response.status_code}")
-            try:
-                error_data = response.json()
-                print(f"   Error: {error_data.get('detail', 'Unknown error')}")
-            except:
-                print(f"   Raw response: {response.text}")
+            # Stream the PCM body straight to disk instead of buffering it in memory
+            total = 0
+            digest = hashlib.md5()
+            with open(pcm_filename, 'wb', buffering=1 << 20) as f:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                    f.write(chunk)
+                    total += len(chunk)
+                    digest.update(chunk)
+        end_time = time.time()
+
+        print(f"✅ TTS request successful:")
+        print(f"   Response time: {end_time - start_time:.2f}s")
+        print(f"   Content-Type: {content_type}")
+        print(f"   Content-Length: {content_length} bytes")
+        print(f"   Data size: {total} bytes (md5 {digest.hexdigest()})")
+        print(f"   RTF: {real_time_factor(end_time - start_time, total, sample_rate):.3f}")
+
+        if not total:
+            print("❌ No audio data received")
             return False
 
+        print(f"   Saved PCM data to: {pcm_filename}")
+        print_audio_stats(pcm_filename)
+        if use_cache:
+            store_audio(text, sample_rate, pcm_filename)
+
+        # Convert PCM to WAV for testing, copying straight from the saved file
+        convert_pcm_to_wav(pcm_filename, wav_filename, sample_rate)
+        print(f"   Converted to WAV: {wav_filename}")
+        return True
+
     except Exception as e:
         print(f"❌ TTS request error: {e}")
         return False
 
-def convert_pcm_to_wav(pcm_data, wav_filename, sample_rate):
-    """Convert raw PCM data to WAV file for testing"""
-    try:
-        # PCM data is 16-bit signed integers, mono
-        num_samples = len(pcm_data) // 2
+def save_pcm(pcm_data, sample_rate):
+    """Save raw PCM data for verification and return its filename"""
+    pcm_filename = f"test_output_{sample_rate}hz.pcm"
+    with open(pcm_filename, 'wb') as f:
+        f.write(pcm_data)
+    print(f"   Saved PCM data to: {pcm_filename}")
+    print_audio_stats(pcm_data)
+    return pcm_filename
+
+def inspect_pcm(pcm):
+    """Return (samples, RMS, peak, clipped ratio) of 16-bit mono PCM (bytes-like or .pcm path)"""
+    if isinstance(pcm, (str, os.PathLike)):
+        # Memory-map the file so the samples are never copied into Python
+        num_samples = os.path.getsize(pcm) // 2
+        if not num_samples:
+            return 0, 0.0, 0, 0.0
+        samples = np.memmap(pcm, dtype='<i2', mode='r', shape=(num_samples,))
+    else:
+        samples = np.frombuffer(pcm, dtype='<i2', count=len(pcm) // 2)
+        if not samples.size:
+            return 0, 0.0, 0, 0.0
+
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    peak = max(int(samples.max()), -int(samples.min()))
+    clipped = float(np.mean((samples == 32767) | (samples == -32768)))
+    return samples.size, rms, peak, clipped
+
+def print_audio_stats(pcm):
+    num_samples, rms, peak, clipped = inspect_pcm(pcm)
+    print(f"   Audio: {num_samples} samples, RMS {rms:.1f}, peak {peak}, clipped {clipped:.2%}")
 
-        with wave.open(wav_filename, 'wb') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 16-bit (2 bytes)
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(pcm_data)
+def wav_header(data_len, sample_rate):
+    """Build the 44-byte RIFF header for 16-bit mono PCM data"""
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_len, b'WAVE',
+        b'fmt ', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b'data', data_len
+    )
+
+def convert_pcm_to_wav(pcm, wav_filename, sample_rate):
+    """Convert raw PCM data (bytes-like or path to a .pcm file) to WAV file for testing"""
+    try:
+        # PCM data is 16-bit signed integers, mono, so only a header is needed
+        if isinstance(pcm, (str, os.PathLike)):
+            data_len = os.path.getsize(pcm)
+            with open(wav_filename, 'wb') as wav_file, open(pcm, 'rb') as pcm_file:
+                wav_file.write(wav_header(data_len, sample_rate))
+                shutil.copyfileobj(pcm_file, wav_file, length=1 << 20)
+        else:
+            data_len = len(pcm)
+            with open(wav_filename, 'wb') as wav_file:
+                wav_file.write(wav_header(data_len, sample_rate))
+                wav_file.write(pcm)
 
+        num_samples = data_len // 2
         print(f"   WAV file created: {num_samples} samples, {sample_rate}Hz")
 
     except Exception as e:
         print(f"   ⚠️  WAV conversion error: {e}")
 
-def test_multiple_sample_rates():
-    """Test multiple sample rates supported by Vapi.ai"""
-    sample_rates = [8000, 16000, 22050, 24000]
+async def _read_body(response):
+    """Read a response body into a buffer preallocated from Content-Length"""
+    length = response.content_length
+    if not length or response.headers.get('Content-Encoding'):
+        return await response.read()
+
+    # Copy each chunk into place instead of collecting a list and joining it
+    buf = bytearray(length)
+    view = memoryview(buf)
+    offset = 0
+    async for chunk in response.content.iter_any():
+        view[offset:offset + len(chunk)] = chunk
+        offset += len(chunk)
+    return buf if offset == length else buf[:offset]
+
+async def _run_one(session, semaphore, sample_rate, timestamp):
+    """POST one TTS request and return (status, body, elapsed seconds)"""
+    request_data = voice_request(
+        f"Testing audio generation at {sample_rate} Hz sample rate.", sample_rate, timestamp
+    )
+    async with semaphore:
+        start_time = time.perf_counter()
+        async with session.post(VAPI_ENDPOINT, json=request_data) as response:
+            body = await _read_body(response)
+            return response.status, body, time.perf_counter() - start_time
 
-    for rate in sample_rates:
-        print(f"\n📊 Testing sample rate: {rate}Hz")
-        success = test_vapi_tts(
-            text=f"Testing audio generation at {rate} Hz sample rate.",
-            sample_rate=rate
+async def _run_sweep(sample_rates, max_in_flight):
+    """Send all sample-rate requests concurrently, at most max_in_flight at a time"""
+    connector = aiohttp.TCPConnector(limit=8, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT[1], sock_connect=REQUEST_TIMEOUT[0])
+    semaphore = asyncio.Semaphore(max_in_flight)
+    timestamp = time.time_ns() // 1_000_000_000
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        return await asyncio.gather(
+            *[_run_one(session, semaphore, rate, timestamp) for rate in sample_rates],
+            return_exceptions=True
         )
-        if not success:
-            print(f"❌ Failed at {rate}Hz")
+
+def test_multiple_sample_rates(max_in_flight=1):
+    """Test multiple sample rates supported by Vapi.ai"""
+    print(f"\n📊 Testing {len(SWEEP_SAMPLE_RATES)} sample rates ({max_in_flight} in flight)...")
+    results = asyncio.run(_run_sweep(SWEEP_SAMPLE_RATES, max_in_flight))
+
+    for rate, result in zip(SWEEP_SAMPLE_RATES, results):
+        print(f"\n📊 Sample rate: {rate}Hz")
+        if isinstance(result, Exception):
+            print(f"❌ Failed at {rate}Hz: {result}")
+            continue
+
+        status, pcm_data, elapsed = result
+        if status == 200 and pcm_data:
+            print(f"   Response time: {elapsed:.2f}s")
+            print(f"   Data size: {len(pcm_data)} bytes")
+            print(f"   RTF: {real_time_factor(elapsed, len(pcm_data), rate):.3f}")
+            # Conversion is just a 44-byte header and a file copy, so do it inline
+            pcm_filename = save_pcm(pcm_data, rate)
+            wav_filename = f"test_output_{rate}hz.wav"
+            convert_pcm_to_wav(pcm_filename, wav_filename, rate)
+            print(f"✅ Success at {rate}Hz (WAV: {wav_filename})")
         else:
-            print(f"✅ Success at {rate}Hz")
+            print(f"❌ Failed at {rate}Hz: {status}")
 
 def test_error_cases():
     """Test error handling"""
     print("\n🚨 Testing error cases...")
 
-    # Test invalid request type
-    print("   Testing invalid request type...")
-    response = requests.post(VAPI_ENDPOINT, json={
-        "type": "invalid-type",
-        "text": "test",
-        "sampleRate": 22050,
-        "timestamp": int(time.time())
-    })
-    print(f"   Invalid type: {response.status_code} (expected 400)")
-
-    # Test invalid sample rate
-    print("   Testing invalid sample rate...")
-    response = requests.post(VAPI_ENDPOINT, json={
-        "type": "voice-request",
-        "text": "test",
-        "sampleRate": 12000,  # Not supported
-        "timestamp": int(time.time())
-    })
-    print(f"   Invalid sample rate: {response.status_code} (expected 400)")
-
-    # Test empty text
-    print("   Testing empty text...")
-    response = requests.post(VAPI_ENDPOINT, json={
-        "type": "voice-request",
-        "text": "",
-        "sampleRate": 22050,
-        "timestamp": int(time.time())
-    })
-    print(f"   Empty text: {response.status_code} (expected 400)")
+    # Each case starts from one valid request and breaks a single field
+    base = voice_request("test", 22050)
+    cases = [
+        ("invalid request type", "Invalid type", "type", "invalid-type"),
+        ("invalid sample rate", "Invalid sample rate", "sampleRate", 12000),  # Not supported
+        ("empty text", "Empty text", "text", ""),
+    ]
+    for description, label, field, value in cases:
+        print(f"   Testing {description}...")
+        response = SESSION.post(VAPI_ENDPOINT, json={**base, field: value}, timeout=REQUEST_TIMEOUT)
+        print(f"   {label}: {response.status_code} (expected 400)")
+
+# Pause after a failed benchmark request, doubling up to the max while failures continue
+ERROR_BACKOFF = 0.25
+ERROR_BACKOFF_MAX = 5.0
+
+async def _benchmark_worker(session, text, sample_rate, deadline, results, errors):
+    """Keep one request in flight until the deadline, recording (ok, ttfb, total, rtf) per request"""
+    backoff = ERROR_BACKOFF
+    while time.perf_counter() < deadline:
+        start_time = time.perf_counter()
+        first_byte = None
+        num_bytes = 0
+        ok = False
+        try:
+            async with session.post(VAPI_ENDPOINT, json=voice_request(text, sample_rate)) as response:
+                async for chunk in response.content.iter_chunked(4096):
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - start_time
+                    num_bytes += len(chunk)
+                ok = response.status == 200 and first_byte is not None
+                if not ok:
+                    errors[f"HTTP {response.status}"] += 1
+        except Exception as e:
+            errors[type(e).__name__] += 1
+        elapsed = time.perf_counter() - start_time
+        results.append((ok, first_byte, elapsed, real_time_factor(elapsed, num_bytes, sample_rate)))
+
+        # Don't hammer a server that is refusing or failing requests
+        if ok:
+            backoff = ERROR_BACKOFF
+        else:
+            await asyncio.sleep(max(0, min(backoff, deadline - time.perf_counter())))
+            backoff = min(backoff * 2, ERROR_BACKOFF_MAX)
+
+async def _run_benchmark(concurrency, duration, text, sample_rate):
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=30)
+    timeout = aiohttp.ClientTimeout(total=120)
+    results = []
+    errors = Counter()
+    start_time = time.perf_counter()
+    deadline = start_time + duration
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        await asyncio.gather(*[
+            _benchmark_worker(session, text, sample_rate, deadline, results, errors)
+            for _ in range(concurrency)
+        ])
+        # Requests in flight at the deadline still finish, so the window runs past duration
+        elapsed = time.perf_counter() - start_time
+    return results, errors, elapsed
+
+def benchmark(concurrency_levels, duration, text, sample_rate):
+    """Load-test the TTS endpoint at each concurrency level and report latency percentiles"""
+    print(f"⏱️  Benchmarking {VAPI_ENDPOINT}")
+    print(f"   Duration: {duration}s per level, Sample Rate: {sample_rate}")
+
+    for concurrency in concurrency_levels:
+        print(f"\n📊 Concurrency: {concurrency}")
+        results, errors, elapsed = asyncio.run(_run_benchmark(concurrency, duration, text, sample_rate))
+        succeeded = [r for r in results if r[0]]
+        print(f"   Requests: {len(results)} ({len(results) - len(succeeded)} failed)")
+        if errors:
+            print(f"   Errors: {', '.join(f'{name} x{count}' for name, count in errors.most_common())}")
+        if not succeeded:
+            print("❌ No successful requests")
+            continue
+
+        ttfb = np.array([r[1] for r in succeeded])
+        total = np.array([r[2] for r in succeeded])
+        rtf = np.array([r[3] for r in succeeded])
+        print(f"   Throughput: {len(succeeded) / elapsed:.2f} req/s over {elapsed:.1f}s")
+        print(f"   {'Metric':<12}{'Avg':>10}{'P50':>10}{'P95':>10}{'P99':>10}")
+        for name, values in (("TTFB (s)", ttfb), ("Total (s)", total), ("RTF", rtf)):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            print(f"   {name:<12}{values.mean():>10.3f}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}")
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
 
 def main():
+    parser = argparse.ArgumentParser(description="Vapi.ai integration test for XTTS API Server")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Reuse audio cached within the last 24h instead of calling /vapi/tts for the basic test")
+    parser.add_argument("--max-in-flight", type=positive_int, default=1,
+                        help="Concurrent requests in the sample-rate sweep (1 = serial and deterministic)")
+    subparsers = parser.add_subparsers(dest="command")
+    bench_parser = subparsers.add_parser("benchmark", help="Load-test the TTS endpoint instead of running the smoke test")
+    bench_parser.add_argument("--concurrency", type=positive_int, nargs="+", default=DEFAULT_CONCURRENCY_LEVELS,
+                              help="Requests kept in flight; pass several levels (e.g. 1 2 4 8 16 32) to compare")
+    bench_parser.add_argument("--duration", type=float, default=30, help="Benchmark duration in seconds")
+    bench_parser.add_argument("--text", type=str, default="Hello from Vapi.ai integration!", help="Text to synthesize")
+    bench_parser.add_argument("--sample-rate", type=int, default=22050, help="Requested sample rate")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark(args.concurrency, args.duration, args.text, args.sample_rate)
+        return
+
     print("🧪 XTTS API Server - Vapi.ai Integration Test")
     print("=" * 50)
 
@@ -175,13 +425,13 @@ def main():
     print("\n" + "=" * 50)
 
     # Test basic TTS
-    success = test_vapi_tts()
+    success = test_vapi_tts(use_cache=args.use_cache)
     if not success:
         print("❌ Basic TTS test failed")
         return
 
     # Test multiple sample rates
-    test_multiple_sample_rates()
+    test_multiple_sample_rates(args.max_in_flight)
 
     # Test error cases
     test_error_cases()